@@ -1,38 +1,83 @@
 import os
+import asyncio
 import hashlib
-from datetime import datetime
+import hmac
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Optional, List
 
-from fastapi import FastAPI, HTTPException
+import time
+
+import bcrypt
+import orjson
+from aiocache import cached
+from aiocache.backends.redis import RedisCache
+from aiocache.serializers import PickleSerializer
+from redis.asyncio import Redis
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, EmailStr
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 from database import db, create_document, get_documents
 
-app = FastAPI(title="SaaS Landing API")
+REDIS_HOST = os.getenv("REDIS_HOST", "127.0.0.1")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+CACHE_TTL = 3600
+
+# Sliding-window login rate limit: attempts allowed per window, per key
+LOGIN_RATE_LIMIT = int(os.getenv("LOGIN_RATE_LIMIT", 10))
+LOGIN_RATE_WINDOW = int(os.getenv("LOGIN_RATE_WINDOW", 60))
+
+_rate_redis = Redis(host=REDIS_HOST, port=REDIS_PORT)
+
+app = FastAPI(title="SaaS Landing API", default_response_class=ORJSONResponse)
+
+# Concrete origin list (comma-separated via ALLOWED_ORIGINS) instead of "*":
+# wildcard + credentials forces the browser to preflight every cross-origin
+# request, and an exact match lets those preflights be cached
+ALLOWED_ORIGINS = [
+    o.strip()
+    for o in os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
+    if o.strip()
+]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
+# Compress responses over ~1 KB (blog lists/posts); smaller ones aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # -----------------------------
 # Models (Request/Response)
 # -----------------------------
-class RegisterRequest(BaseModel):
+# Request bodies are plain dataclasses: FastAPI validates them through
+# lightweight pydantic dataclass wrappers without full BaseModel overhead
+@dataclass
+class RegisterRequest:
     name: str
     email: EmailStr
     password: str
 
-class LoginRequest(BaseModel):
+@dataclass
+class LoginRequest:
     email: EmailStr
     password: str
 
-class ContactRequest(BaseModel):
+@dataclass
+class ContactRequest:
     name: str
     email: EmailStr
     message: str
@@ -50,14 +95,62 @@ class BlogResponse(BaseModel):
 # Helpers
 # -----------------------------
 
-def sha256(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+# Verified against when a login email has no user row, so that a response takes
+# the same time whether or not the account exists (no enumeration via timing).
+_DUMMY_HASH = bcrypt.hashpw(b"dummy", bcrypt.gensalt(rounds=12)).decode("utf-8")
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with bcrypt (salted, 12 rounds)."""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=12)).decode("utf-8")
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against a stored bcrypt hash in constant time."""
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    except ValueError:
+        # Stored value is not a valid bcrypt hash (e.g. a legacy SHA-256 digest)
+        return False
+
 
+async def within_login_rate_limit(key: str) -> bool:
+    """Record a login attempt for key and report whether it is still allowed.
 
-def ensure_sample_blog_posts():
-    """Seed a few blog posts if none exist yet."""
-    count = db["blogpost"].count_documents({}) if db else 0
-    if count == 0 and db is not None:
+    Sliding window over a Redis sorted set scored by timestamp. Fails open if
+    Redis is unreachable so an outage cannot lock everyone out.
+    """
+    try:
+        now = time.time()
+        rkey = f"ratelimit:login:{key}"
+        pipe = _rate_redis.pipeline()
+        pipe.zremrangebyscore(rkey, 0, now - LOGIN_RATE_WINDOW)
+        pipe.zadd(rkey, {str(time.time_ns()): now})
+        pipe.zcard(rkey)
+        pipe.expire(rkey, LOGIN_RATE_WINDOW)
+        _, _, count, _ = await pipe.execute()
+        return count <= LOGIN_RATE_LIMIT
+    except Exception:
+        return True
+
+
+def is_legacy_sha256_hash(password: str, password_hash: str) -> bool:
+    """Match a password against a legacy unsalted SHA-256 hex digest."""
+    digest = hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return hmac.compare_digest(password_hash, digest)
+
+
+# Set once sample posts are known to exist, so list_blog never pays for a
+# count_documents round-trip after startup
+_SEEDED = False
+
+
+async def ensure_sample_blog_posts():
+    """Seed the sample blog posts (idempotent, safe across workers)."""
+    global _SEEDED
+    if _SEEDED:
+        return
+    if db is not None:
         samples = [
             {
                 "title": "Designing With Pastels: A Gentle UI Aesthetic",
@@ -87,21 +180,51 @@ def ensure_sample_blog_posts():
                 "published_at": datetime.utcnow(),
             },
         ]
+        # One bulk round-trip of per-slug upserts: $setOnInsert only writes
+        # when the slug is missing, and the unique slug index keeps racing
+        # workers from both inserting the same post
+        now = datetime.now(timezone.utc)
+        ops = []
         for post in samples:
-            # Use create_document helper to add timestamps
-            create_document("blogpost", post)
+            post["created_at"] = now
+            post["updated_at"] = now
+            ops.append(UpdateOne({"slug": post["slug"]}, {"$setOnInsert": post}, upsert=True))
+        await db["blogpost"].bulk_write(ops, ordered=False)
+        _SEEDED = True
+
+
+async def ensure_indexes():
+    """Create the indexes the hot queries rely on (no-op if they exist)."""
+    if db is None:
+        return
+    # Login and registration look up users by email; unique makes the database
+    # the single authority on duplicates so register can rely on it
+    await db["user"].create_index("email", unique=True)
+    # get_blog looks up posts by slug; unique also keeps concurrent seed
+    # upserts from inserting the same post twice
+    await db["blogpost"].create_index("slug", unique=True)
+
+
+@app.on_event("startup")
+async def seed_on_startup():
+    await ensure_indexes()
+    await ensure_sample_blog_posts()
 
 
 # -----------------------------
 # Core Routes
 # -----------------------------
+# Static payloads, serialized once at import so the handlers just hand back bytes
+_ROOT_BODY = orjson.dumps({"message": "SaaS Landing API running"})
+
+
 @app.get("/")
 def root():
-    return {"message": "SaaS Landing API running"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -117,7 +240,7 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                response["collections"] = db.list_collection_names()
+                response["collections"] = await db.list_collection_names()
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
                 response["database"] = f"⚠️ Connected but Error: {str(e)[:80]}"
@@ -129,63 +252,101 @@ def test_database():
 # -----------------------------
 # Pricing
 # -----------------------------
+_PLAN_DATA = [
+    {
+        "name": "Free",
+        "price": 0,
+        "period": "mo",
+        "features": ["Basic analytics", "Community support", "1 project"],
+        "cta": "Get started",
+        "highlight": False,
+    },
+    {
+        "name": "Pro",
+        "price": 19,
+        "period": "mo",
+        "features": ["Unlimited projects", "Email support", "Custom domains"],
+        "cta": "Start Pro",
+        "highlight": True,
+    },
+    {
+        "name": "Business",
+        "price": 49,
+        "period": "mo",
+        "features": ["Team seats", "SLA support", "SSO"],
+        "cta": "Contact sales",
+        "highlight": False,
+    },
+]
+
+_PRICING_BODY = orjson.dumps({"plans": _PLAN_DATA})
+_PRICING_ETAG = f'"{hashlib.md5(_PRICING_BODY).hexdigest()}"'
+
+# Read-only view for in-process consumers; mutating a plan through this would
+# silently diverge from the serialized body above
+PRICING_PLANS = tuple(MappingProxyType(p) for p in _PLAN_DATA)
+
+
 @app.get("/api/pricing")
-def get_pricing():
-    return {
-        "plans": [
-            {
-                "name": "Free",
-                "price": 0,
-                "period": "mo",
-                "features": ["Basic analytics", "Community support", "1 project"],
-                "cta": "Get started",
-                "highlight": False,
-            },
-            {
-                "name": "Pro",
-                "price": 19,
-                "period": "mo",
-                "features": ["Unlimited projects", "Email support", "Custom domains"],
-                "cta": "Start Pro",
-                "highlight": True,
-            },
-            {
-                "name": "Business",
-                "price": 49,
-                "period": "mo",
-                "features": ["Team seats", "SLA support", "SSO"],
-                "cta": "Contact sales",
-                "highlight": False,
-            },
-        ]
-    }
+def get_pricing(request: Request):
+    headers = {"ETag": _PRICING_ETAG, "Cache-Control": f"public, max-age={CACHE_TTL}"}
+    if request.headers.get("if-none-match") == _PRICING_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_PRICING_BODY, media_type="application/json", headers=headers)
 
 
 # -----------------------------
 # Auth (simple demo)
 # -----------------------------
 @app.post("/api/auth/register")
-def register(payload: RegisterRequest):
-    # Ensure unique email
-    existing = db["user"].find_one({"email": payload.email}) if db else None
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
+async def register(payload: RegisterRequest):
+    # Hashing takes ~100ms of CPU; keep it off the event loop
+    password_hash = await asyncio.to_thread(hash_password, payload.password)
     user_doc = {
         "name": payload.name,
         "email": payload.email,
-        "password_hash": sha256(payload.password),
+        "password_hash": password_hash,
         "plan": "free",
         "is_active": True,
     }
-    user_id = create_document("user", user_doc)
+    # The unique index on user.email is the duplicate check; a find_one
+    # pre-check would cost a round-trip and still lose concurrent races
+    try:
+        user_id = await create_document("user", user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return {"id": user_id, "name": payload.name, "email": payload.email, "plan": "free"}
 
 
 @app.post("/api/auth/login")
-def login(payload: LoginRequest):
-    user = db["user"].find_one({"email": payload.email}) if db else None
-    if not user or user.get("password_hash") != sha256(payload.password):
+async def login(payload: LoginRequest, request: Request):
+    # Throttle by source IP and by target account so neither a single host
+    # nor a distributed attack on one email can hammer bcrypt
+    client_ip = request.client.host if request.client else "unknown"
+    ip_ok = await within_login_rate_limit(f"ip:{client_ip}")
+    email_ok = await within_login_rate_limit(f"email:{payload.email}")
+    if not ip_ok or not email_ok:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(LOGIN_RATE_WINDOW)},
+        )
+    user = await db["user"].find_one({"email": payload.email}) if db is not None else None
+    # Always run a bcrypt check, even for unknown emails, to keep timing uniform
+    stored_hash = user.get("password_hash", "") if user else _DUMMY_HASH
+    # bcrypt is CPU-bound, so run it off the event loop
+    ok = await asyncio.to_thread(verify_password, payload.password, stored_hash)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if not ok:
+        if not is_legacy_sha256_hash(payload.password, stored_hash):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        # Legacy SHA-256 row: upgrade to bcrypt on successful login
+        new_hash = await asyncio.to_thread(hash_password, payload.password)
+        await db["user"].update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password_hash": new_hash}},
+        )
     return {"id": str(user.get("_id")), "name": user.get("name"), "email": user.get("email"), "plan": user.get("plan", "free")}
 
 
@@ -193,27 +354,36 @@ def login(payload: LoginRequest):
 # Blog
 # -----------------------------
 @app.get("/api/blog")
-def list_blog(limit: int = 6):
-    ensure_sample_blog_posts()
-    docs = get_documents("blogpost", {}, limit)
-    items = []
-    for d in docs:
-        items.append({
-            "title": d.get("title"),
-            "slug": d.get("slug"),
-            "excerpt": d.get("excerpt"),
-            "author": d.get("author", "Team"),
-            "published_at": d.get("published_at"),
-            "tags": d.get("tags", []),
-        })
-    return {"posts": items}
-
-
-@app.get("/api/blog/{slug}")
-def get_blog(slug: str):
-    doc = db["blogpost"].find_one({"slug": slug}) if db else None
+@cached(
+    ttl=CACHE_TTL,
+    cache=RedisCache,
+    endpoint=REDIS_HOST,
+    port=REDIS_PORT,
+    key_builder=lambda f, *a, **kw: f"blog:list:{kw.get('limit', 6)}",
+    # Pickle (not JSON) because post documents carry datetime values
+    serializer=PickleSerializer(),
+)
+async def list_blog(limit: int = Query(6, ge=1, le=50)):
+    # Project away _id and the full post body; the list only shows summaries
+    projection = {"_id": 0, "title": 1, "slug": 1, "excerpt": 1, "author": 1, "published_at": 1, "tags": 1}
+    # The projection already shapes the documents; no per-row rebuild needed
+    docs = await get_documents("blogpost", {}, limit, projection)
+    return {"posts": docs}
+
+
+@cached(
+    ttl=CACHE_TTL,
+    cache=RedisCache,
+    endpoint=REDIS_HOST,
+    port=REDIS_PORT,
+    key_builder=lambda f, *a, **kw: f"blog:post:{a[0] if a else kw.get('slug')}",
+    serializer=PickleSerializer(),
+)
+async def _fetch_blog_post(slug: str):
+    projection = {"_id": 0, "title": 1, "slug": 1, "excerpt": 1, "content": 1, "author": 1, "published_at": 1, "tags": 1}
+    doc = await db["blogpost"].find_one({"slug": slug}, projection) if db is not None else None
     if not doc:
-        raise HTTPException(status_code=404, detail="Post not found")
+        return None
     return {
         "title": doc.get("title"),
         "slug": doc.get("slug"),
@@ -225,22 +395,38 @@ def get_blog(slug: str):
     }
 
 
+@app.get("/api/blog/{slug}")
+async def get_blog(slug: str, request: Request):
+    post = await _fetch_blog_post(slug)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    body = orjson.dumps(post)
+    # Content-derived ETag, so revalidation stays correct after edits
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CACHE_TTL}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # -----------------------------
 # Contact
 # -----------------------------
 @app.post("/api/contact")
-def contact(payload: ContactRequest):
+async def contact(payload: ContactRequest):
     doc = {
         "name": payload.name,
         "email": payload.email,
         "message": payload.message,
         "status": "new",
     }
-    message_id = create_document("contactmessage", doc)
+    message_id = await create_document("contactmessage", doc)
     return {"id": message_id, "status": "received"}
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", 4))
+    # Import string (not the app object) is required for multi-worker mode
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers, loop="uvloop", http="httptools")
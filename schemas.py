@@ -12,7 +12,7 @@ class User(BaseModel):
     """Auth users collection"""
     name: str = Field(..., description="Full name")
     email: EmailStr = Field(..., description="Unique email address")
-    password_hash: str = Field(..., description="SHA256 password hash")
+    password_hash: str = Field(..., description="Bcrypt password hash")
     plan: str = Field("free", description="Subscription plan: free, pro, business")
     is_active: bool = Field(True, description="Whether user is active")
 
@@ -15,5 +15,7 @@ mkdir -p logs
 echo "Installing dependencies..."
 pip install -r requirements.txt
 echo "Starting FastAPI server..."
-nohup uvicorn main:app --host 0.0.0.0 --port 8000 --reload > logs/server.log 2>&1 
-echo "Server started in background"
+# --reload is incompatible with --workers; use WEB_CONCURRENCY=1 for dev reload
+WORKERS=${WEB_CONCURRENCY:-4}
+nohup uvicorn main:app --host 0.0.0.0 --port 8000 --workers "$WORKERS" --loop uvloop --http httptools > logs/server.log 2>&1
+echo "Server started in background with $WORKERS workers"